@@ -1,30 +1,232 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
+from contextlib import asynccontextmanager
 import uuid
 import json
+import re
+import hashlib
+import operator
 from datetime import datetime
 import asyncio
-from collections import defaultdict, deque
+import array
+from collections import defaultdict, OrderedDict
+import aiosqlite
+from aiosqlitepool import SQLiteConnectionPool
 import openai
 import os
 
-app = FastAPI(title="Agentic Flow Orchestrator", version="1.0.0")
+# Optional semantic cache backend - only used when sentence-transformers
+# is installed and LLM_SEMANTIC_CACHE is enabled
+try:
+    from sentence_transformers import SentenceTransformer, util as st_util
+except ImportError:
+    SentenceTransformer = None
+
+# Optional Numba JIT for numeric FunctionNode code - falls back to the
+# interpreted path when Numba is missing or cannot type the function
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Optional RestrictedPython sandbox for FunctionNode - compiles user code
+# with AOT restriction checks so attribute/import escapes are rejected at
+# compile time instead of relying on a builtins whitelist alone
+try:
+    from RestrictedPython import compile_restricted, safe_builtins as rp_safe_builtins
+    from RestrictedPython.Eval import default_guarded_getitem, default_guarded_getiter
+    from RestrictedPython.Guards import (
+        guarded_iter_unpack_sequence,
+        guarded_unpack_sequence,
+        safer_getattr,
+        full_write_guard,
+    )
+except ImportError:
+    compile_restricted = None
+
+# RestrictedPython rewrites augmented assignment to `_inplacevar_(op, x, y)`
+# but does not ship an implementation; dispatch to the matching in-place
+# operator so `total += x` works the same as on the plain exec path
+_INPLACE_OPS = {
+    '+=': operator.iadd,
+    '-=': operator.isub,
+    '*=': operator.imul,
+    '/=': operator.itruediv,
+    '//=': operator.ifloordiv,
+    '%=': operator.imod,
+    '**=': operator.ipow,
+    '<<=': operator.ilshift,
+    '>>=': operator.irshift,
+    '&=': operator.iand,
+    '|=': operator.ior,
+    '^=': operator.ixor,
+    '@=': operator.imatmul,
+}
+
+def _guarded_inplacevar(op: str, x: Any, y: Any) -> Any:
+    try:
+        return _INPLACE_OPS[op](x, y)
+    except KeyError:
+        raise NotImplementedError(f"Augmented assignment {op} is not allowed")
+
+# SQLite storage - a connection pool keeps long-lived connections (and
+# SQLite's page cache) warm across requests instead of reconnecting per op
+DATABASE_PATH = os.getenv('DATABASE_PATH', 'flows.db')
+
+db_pool: Optional[SQLiteConnectionPool] = None
+
+async def _sqlite_connection():
+    conn = await aiosqlite.connect(DATABASE_PATH)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db_pool
+    db_pool = SQLiteConnectionPool(_sqlite_connection)
+    async with db_pool.connection() as conn:
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS flows (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS executions (id TEXT PRIMARY KEY, flow_id TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        # Execution history is always queried per flow; index the filter column
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_executions_flow_id ON executions(flow_id)"
+        )
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        await conn.commit()
+    await llm_cache.load_persisted()
+    yield
+    await db_pool.close()
+    if llm_client is not None:
+        await llm_client.close()
+
+# ORJSONResponse serializes responses with orjson (C-speed, native
+# datetime handling) instead of the stdlib json encoder
+app = FastAPI(
+    title="Agentic Flow Orchestrator",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# CORS middleware - enumerate origins via ALLOWED_ORIGINS (comma-separated)
+# so the middleware can short-circuit origin checks, and set max_age so
+# browsers cache preflight responses instead of re-issuing OPTIONS
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv('ALLOWED_ORIGINS', '').split(',') if o.strip()]
 
-# CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=ALLOWED_ORIGINS or ["*"],
+    # Credentials are only valid with enumerated origins, never with "*"
+    allow_credentials=bool(ALLOWED_ORIGINS),
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
-# In-memory storage (replace with database in production)
-flows_db = {}
-executions_db = {}
+# Shared async OpenAI client - the key is read once at import and the
+# client is created once, so the hot path does no getenv syscalls or
+# client allocation and the TLS connection pool is reused across calls
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+llm_client: Optional[openai.AsyncOpenAI] = (
+    openai.AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+)
+
+# Bound in-flight LLM calls so a wide flow level (or hedged duplicates)
+# cannot fan out into provider rate limits; each API call holds a permit
+llm_semaphore = asyncio.Semaphore(int(os.getenv('LLM_CONCURRENCY', '16')))
+LLM_MAX_RETRIES = 3
+
+# LLM response cache - repeated prompts are common in agent workloads, so
+# serve them from memory instead of paying another API round trip
+LLM_CACHE_MAX_ENTRIES = 10000
+LLM_SEMANTIC_THRESHOLD = 0.95
+
+class LLMResponseCache:
+    """Two-tier cache: exact sha256 match, plus optional embedding similarity."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._exact: OrderedDict = OrderedDict()
+        self._embedder = None
+        self._embeddings = {}  # cache key -> prompt embedding
+
+    @staticmethod
+    def make_key(model: str, prompt: str, max_tokens: int) -> str:
+        return hashlib.sha256(f"{model}|{prompt}|{max_tokens}".encode()).hexdigest()
+
+    def _get_embedder(self):
+        if self._embedder is None and SentenceTransformer is not None:
+            self._embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        return self._embedder
+
+    def get(self, key: str, prompt: str) -> Optional[str]:
+        if key in self._exact:
+            self._exact.move_to_end(key)
+            return self._exact[key]
+
+        # Semantic fallback: return a cached response for a near-identical prompt
+        if os.getenv('LLM_SEMANTIC_CACHE') and self._embeddings:
+            embedder = self._get_embedder()
+            if embedder is not None:
+                query = embedder.encode(prompt, convert_to_tensor=True)
+                for cached_key, embedding in self._embeddings.items():
+                    if cached_key not in self._exact:
+                        continue
+                    if st_util.cos_sim(query, embedding).item() > LLM_SEMANTIC_THRESHOLD:
+                        self._exact.move_to_end(cached_key)
+                        return self._exact[cached_key]
+        return None
+
+    def put(self, key: str, prompt: str, response: str):
+        self._exact[key] = response
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            evicted, _ = self._exact.popitem(last=False)
+            self._embeddings.pop(evicted, None)
+
+        if os.getenv('LLM_SEMANTIC_CACHE'):
+            embedder = self._get_embedder()
+            if embedder is not None:
+                self._embeddings[key] = embedder.encode(prompt, convert_to_tensor=True)
+
+    async def load_persisted(self):
+        # Warm the exact tier from the database so cached responses
+        # survive restarts; newest rows win the LRU slots. The table is
+        # trimmed to max_entries here so it cannot grow without bound
+        async with db_pool.connection() as conn:
+            await conn.execute(
+                "DELETE FROM llm_cache WHERE rowid NOT IN "
+                "(SELECT rowid FROM llm_cache ORDER BY rowid DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            await conn.commit()
+            cursor = await conn.execute("SELECT key, response FROM llm_cache ORDER BY rowid")
+            rows = await cursor.fetchall()
+        for key, response in rows:
+            self._exact[key] = response
+
+    async def persist(self, key: str, response: str):
+        # Write-through for the exact tier only; embeddings are cheap to
+        # recompute and tensors do not belong in the database
+        async with db_pool.connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+                (key, response)
+            )
+            await conn.commit()
+
+llm_cache = LLMResponseCache()
 
 # Pydantic models
 class NodeData(BaseModel):
@@ -57,6 +259,29 @@ class ExecutionResult(BaseModel):
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
 
+# Storage helpers - flows and executions are stored as JSON blobs
+async def load_flow(flow_id: str) -> Optional[FlowData]:
+    async with db_pool.connection() as conn:
+        cursor = await conn.execute("SELECT data FROM flows WHERE id = ?", (flow_id,))
+        row = await cursor.fetchone()
+    return FlowData.model_validate_json(row[0]) if row else None
+
+async def save_flow(flow: FlowData):
+    async with db_pool.connection() as conn:
+        await conn.execute(
+            "INSERT OR REPLACE INTO flows (id, data) VALUES (?, ?)",
+            (flow.id, flow.model_dump_json())
+        )
+        await conn.commit()
+
+async def save_execution(execution: ExecutionResult):
+    async with db_pool.connection() as conn:
+        await conn.execute(
+            "INSERT OR REPLACE INTO executions (id, flow_id, data) VALUES (?, ?, ?)",
+            (execution.id, execution.flow_id, execution.model_dump_json())
+        )
+        await conn.commit()
+
 # Node implementations
 class BaseNode:
     def __init__(self, node_id: str, data: Dict[str, Any]):
@@ -66,70 +291,208 @@ class BaseNode:
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
 
+# Matches {placeholder} tokens so a template is rendered in one scan
+# instead of one str.replace pass per variable
+_PLACEHOLDER_PATTERN = re.compile(r'\{([^{}]+)\}')
+
 class PromptNode(BaseNode):
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         template = self.data.get('template', '')
         variables = self.data.get('variables', {})
-        
-        # Replace variables in template
-        result = template
-        for key, value in variables.items():
-            result = result.replace(f'{{{key}}}', str(value))
-        
-        # Replace with input values
-        for key, value in inputs.items():
-            result = result.replace(f'{{{key}}}', str(value))
-        
+
+        # Node variables take precedence over inputs, matching the old
+        # replace order; unknown placeholders are left as-is
+        merged = {**inputs, **variables}
+        result = _PLACEHOLDER_PATTERN.sub(
+            lambda m: str(merged[m.group(1)]) if m.group(1) in merged else m.group(0),
+            template
+        )
+
         return {"output": result}
 
+# Numba-compiled user functions keyed by source hash; None marks sources
+# that failed JIT compilation so they are not retried
+_jit_cache: Dict[str, Any] = {}
+
+# Interpreted user functions keyed by source hash, so repeat executions
+# reuse the function object instead of re-parsing and re-compiling
+_code_cache: Dict[str, Any] = {}
+
 class FunctionNode(BaseNode):
+    SAFE_BUILTINS = {
+        'len': len,
+        'str': str,
+        'int': int,
+        'float': float,
+        'bool': bool,
+        'list': list,
+        'dict': dict,
+        'sum': sum,
+        'max': max,
+        'min': min,
+    }
+
+    def _build_function(self, function_code: str):
+        src_hash = hashlib.md5(function_code.encode()).hexdigest()
+        fn = _code_cache.get(src_hash)
+        if fn is None:
+            src = f"def user_function(input_data, inputs):\n    {function_code}"
+            if compile_restricted is not None:
+                code = compile_restricted(src, '<userfn>', 'exec')
+                safe_globals = {
+                    '__builtins__': {**rp_safe_builtins, **self.SAFE_BUILTINS},
+                    '_getattr_': safer_getattr,
+                    '_getitem_': default_guarded_getitem,
+                    '_getiter_': default_guarded_getiter,
+                    '_iter_unpack_sequence_': guarded_iter_unpack_sequence,
+                    '_unpack_sequence_': guarded_unpack_sequence,
+                    '_inplacevar_': _guarded_inplacevar,
+                    '_write_': full_write_guard,
+                }
+            else:
+                code = compile(src, '<userfn>', 'exec')
+                safe_globals = {'__builtins__': dict(self.SAFE_BUILTINS)}
+            exec(code, safe_globals)
+            fn = safe_globals['user_function']
+            _code_cache[src_hash] = fn
+        return fn
+
+    def _build_jit_candidate(self, function_code: str):
+        # Single-argument variant for Numba: nopython mode cannot type the
+        # inputs dict, so only functions that never reference it qualify.
+        # Deliberately compiled without RestrictedPython - restricted code
+        # rewrites loops, subscripts and augmented assignment into guard
+        # calls that nopython mode can never type, which would leave only
+        # guard-free straight-line arithmetic eligible. Plain compile() is
+        # safe here because this function object is never interpreted: it
+        # is only executed through nopython-compiled code, and on typing
+        # failure it is discarded unused
+        src = f"def user_function(input_data):\n    {function_code}"
+        code = compile(src, '<userfn>', 'exec')
+        safe_globals = {'__builtins__': dict(self.SAFE_BUILTINS)}
+        exec(code, safe_globals)
+        return safe_globals['user_function']
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         function_code = self.data.get('code', 'return input_data')
-        
-        # Create a safe execution environment
-        safe_globals = {
-            '__builtins__': {
-                'len': len,
-                'str': str,
-                'int': int,
-                'float': float,
-                'bool': bool,
-                'list': list,
-                'dict': dict,
-                'sum': sum,
-                'max': max,
-                'min': min,
-            }
-        }
-        
+
+        # Try the JIT path for numeric code; nodes can set jit: false to
+        # skip the compile attempt for string-heavy functions. Only code
+        # that ignores the inputs dict and receives a numeric input can
+        # ever compile in nopython mode, so anything else goes straight
+        # to the interpreted path without paying for an LLVM attempt
+        input_value = inputs.get('input', '')
+        if (numba is not None and self.data.get('jit', True)
+                and isinstance(input_value, (int, float))
+                and 'inputs' not in function_code):
+            src_hash = hashlib.md5(function_code.encode()).hexdigest()
+            if src_hash not in _jit_cache:
+                try:
+                    _jit_cache[src_hash] = numba.njit(self._build_jit_candidate(function_code))
+                except Exception:
+                    _jit_cache[src_hash] = None
+            jitted = _jit_cache[src_hash]
+            if jitted is not None:
+                try:
+                    result = jitted(input_value)
+                    return {"output": result}
+                except Exception:
+                    # Numba could not type this function; stop trying to JIT it
+                    _jit_cache[src_hash] = None
+
         try:
             # Execute the function code
-            exec(f"def user_function(input_data, inputs):\n    {function_code}", safe_globals)
-            result = safe_globals['user_function'](inputs.get('input', ''), inputs)
+            result = self._build_function(function_code)(inputs.get('input', ''), inputs)
             return {"output": result}
         except Exception as e:
             return {"output": f"Error: {str(e)}"}
 
 class LLMNode(BaseNode):
+    async def _complete(self, client, model: str, prompt: str) -> str:
+        for attempt in range(LLM_MAX_RETRIES):
+            try:
+                async with llm_semaphore:
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        max_tokens=150
+                    )
+                return response.choices[0].message.content
+            except openai.RateLimitError:
+                if attempt == LLM_MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _complete_stream(self, client, model: str, prompt: str) -> str:
+        # Consume the completion as a token stream; chunks are accumulated
+        # because downstream nodes consume whole outputs, but a slow or
+        # stalled generation surfaces (and can be cancelled) at the first
+        # token instead of after the full decode
+        async with llm_semaphore:
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=150,
+                stream=True
+            )
+            chunks = []
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+        return ''.join(chunks)
+
+    async def _complete_hedged(self, client, model: str, prompt: str, hedge_ms: float) -> str:
+        # Fire a backup request after hedge_ms (set it near the P95 latency)
+        # and take whichever finishes first; trades a few duplicate tokens
+        # for a much tighter tail
+        async def backup():
+            await asyncio.sleep(hedge_ms / 1000)
+            return await self._complete(client, model, prompt)
+
+        tasks = {
+            asyncio.create_task(self._complete(client, model, prompt)),
+            asyncio.create_task(backup()),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        # Both legs can land in done on the same tick; prefer one that
+        # succeeded, and touch every exception so a losing leg is not
+        # logged as "Task exception was never retrieved"
+        winner = None
+        for task in done:
+            if task.exception() is None and winner is None:
+                winner = task
+        if winner is None:
+            winner = done.pop()
+        return winner.result()
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         prompt = inputs.get('prompt', self.data.get('prompt', ''))
         model = self.data.get('model', 'gpt-3.5-turbo')
-        
+        hedge_ms = self.data.get('hedge_ms')
+
         # Mock LLM response (replace with actual LLM call)
-        if os.getenv('OPENAI_API_KEY'):
+        if llm_client is not None:
+            cache_key = llm_cache.make_key(model, prompt, 150)
+            cached = llm_cache.get(cache_key, prompt)
+            if cached is not None:
+                return {"output": cached}
             try:
-                client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=150
-                )
-                result = response.choices[0].message.content
+                if hedge_ms:
+                    result = await self._complete_hedged(llm_client, model, prompt, float(hedge_ms))
+                elif self.data.get('stream'):
+                    result = await self._complete_stream(llm_client, model, prompt)
+                else:
+                    result = await self._complete(llm_client, model, prompt)
+                llm_cache.put(cache_key, prompt, result)
+                await llm_cache.persist(cache_key, result)
             except Exception as e:
                 result = f"LLM Error: {str(e)}"
         else:
             result = f"Mock LLM response for: {prompt}"
-        
+
         return {"output": result}
 
 class StartNode(BaseNode):
@@ -141,6 +504,75 @@ class EndNode(BaseNode):
         return {"output": inputs.get('input', 'Completed')}
 
 # Flow execution engine
+async def _safe_execute(node: BaseNode, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await node.execute(inputs)
+    except Exception as e:
+        return {"error": str(e)}
+
+class CompiledFlow:
+    """Per-flow execution plan: node instances, wiring and level order are
+    built once at save time and reused across runs, keeping class lookup
+    and object construction out of the per-execution path."""
+
+    def __init__(self, engine: 'FlowEngine', flow: FlowData):
+        graph, in_degree, predecessors, node_map, ids = engine.build_graph(flow.nodes, flow.edges)
+        self.predecessors = predecessors
+        self.node_map = node_map
+        self.levels = engine.topological_levels(graph, in_degree, ids)
+        # None marks unknown node types; reported per-node at execution time
+        self.instances = {
+            node.id: engine.node_types[node.type](node.id, node.data)
+            if node.type in engine.node_types else None
+            for node in flow.nodes
+        }
+        # Specialized runner: the level order is unrolled into straight-line
+        # generated code, removing the scheduler loop from the hot path.
+        # None means the generic engine loop is used instead
+        try:
+            self.run = self._generate_runner()
+        except Exception:
+            self.run = None
+
+    def _generate_runner(self):
+        if any(instance is None for instance in self.instances.values()):
+            return None  # unknown node types need the generic error path
+
+        lines = [
+            "async def _flow_run(plan):",
+            "    instances = plan.instances",
+            "    node_outputs = {}",
+            "    results = {}",
+        ]
+        var = {}
+        for level in self.levels:
+            # Unroll input wiring: each incoming edge becomes one guarded
+            # assignment, since a failed predecessor produces no output
+            for node_id in level:
+                var[node_id] = n = len(var)
+                lines.append(f"    in_{n} = {{}}")
+                for source, handle in self.predecessors[node_id]:
+                    lines.append(f"    if {source!r} in node_outputs:")
+                    lines.append(f"        in_{n}[{handle or 'input'!r}] = node_outputs[{source!r}]")
+
+            calls = [f"_safe(instances[{nid!r}], in_{var[nid]})" for nid in level]
+            targets = ", ".join(f"r_{var[nid]}" for nid in level)
+            if len(level) == 1:
+                lines.append(f"    {targets} = await {calls[0]}")
+            else:
+                lines.append(f"    {targets} = await asyncio.gather({', '.join(calls)})")
+
+            for node_id in level:
+                n = var[node_id]
+                lines.append(f"    results[{node_id!r}] = r_{n}")
+                lines.append(f"    if 'error' not in r_{n}:")
+                lines.append(f"        node_outputs[{node_id!r}] = r_{n}.get('output', r_{n})")
+        lines.append("    return results")
+
+        namespace = {'asyncio': asyncio, '_safe': _safe_execute}
+        exec(compile("\n".join(lines), '<flowgen>', 'exec'), namespace)
+        return namespace['_flow_run']
+
 class FlowEngine:
     def __init__(self):
         self.node_types = {
@@ -150,69 +582,97 @@ class FlowEngine:
             'start': StartNode,
             'end': EndNode
         }
-    
+        self._compiled: Dict[str, CompiledFlow] = {}
+
+    def compile_flow(self, flow: FlowData) -> CompiledFlow:
+        plan = CompiledFlow(self, flow)
+        self._compiled[flow.id] = plan
+        return plan
+
+    def invalidate(self, flow_id: str):
+        self._compiled.pop(flow_id, None)
+
     def build_graph(self, nodes: List[NodeData], edges: List[EdgeData]):
-        graph = defaultdict(list)
-        in_degree = defaultdict(int)
+        # Node ids are mapped to contiguous integer indices so the graph is
+        # plain lists and a flat int array instead of string-keyed dicts -
+        # array indexing beats hashing on every edge visit
+        index = {node.id: i for i, node in enumerate(nodes)}
+        ids = [node.id for node in nodes]
+        graph = [[] for _ in nodes]
+        in_degree = array.array('i', [0] * len(nodes))
+        predecessors = defaultdict(list)
         node_map = {node.id: node for node in nodes}
-        
+
         for edge in edges:
-            graph[edge.source].append(edge.target)
-            in_degree[edge.target] += 1
-        
-        # Ensure all nodes are in in_degree
-        for node in nodes:
-            if node.id not in in_degree:
-                in_degree[node.id] = 0
-        
-        return graph, in_degree, node_map
-    
-    def topological_sort(self, graph, in_degree):
-        queue = deque([node for node, degree in in_degree.items() if degree == 0])
-        result = []
-        
-        while queue:
-            node = queue.popleft()
-            result.append(node)
-            
-            for neighbor in graph[node]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
-        
-        return result
+            source = index.get(edge.source)
+            target = index.get(edge.target)
+            if source is None or target is None:
+                continue  # edge references a node not in this flow
+            graph[source].append(target)
+            in_degree[target] += 1
+            predecessors[edge.target].append((edge.source, edge.sourceHandle))
+
+        return graph, in_degree, predecessors, node_map, ids
     
+    def topological_levels(self, graph, in_degree, ids):
+        # Kahn's algorithm grouped by level: every node in a level has all of
+        # its predecessors in earlier levels, so levels can run concurrently.
+        # Works on int indices; ids are only translated at the boundary
+        ready = [i for i, degree in enumerate(in_degree) if degree == 0]
+        levels = []
+
+        while ready:
+            levels.append([ids[i] for i in ready])
+            next_ready = []
+            for node in ready:
+                for neighbor in graph[node]:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        next_ready.append(neighbor)
+            ready = next_ready
+
+        return levels
+
+    async def _run_node(self, node_id: str, plan: CompiledFlow, node_outputs) -> Dict[str, Any]:
+        node = plan.instances[node_id]
+
+        if node is None:
+            return {"error": f"Unknown node type: {plan.node_map[node_id].type}"}
+
+        # Gather inputs from predecessor nodes
+        inputs = {
+            handle or 'input': node_outputs[source]
+            for source, handle in plan.predecessors[node_id]
+            if source in node_outputs
+        }
+
+        try:
+            return await node.execute(inputs)
+        except Exception as e:
+            return {"error": str(e)}
+
     async def execute_flow(self, flow: FlowData) -> Dict[str, Any]:
-        graph, in_degree, node_map = self.build_graph(flow.nodes, flow.edges)
-        execution_order = self.topological_sort(graph, in_degree)
-        
+        plan = self._compiled.get(flow.id)
+        if plan is None:
+            plan = self.compile_flow(flow)
+
+        if plan.run is not None:
+            return await plan.run(plan)
+
         results = {}
         node_outputs = {}
-        
-        for node_id in execution_order:
-            node_data = node_map[node_id]
-            node_class = self.node_types.get(node_data.type)
-            
-            if not node_class:
-                results[node_id] = {"error": f"Unknown node type: {node_data.type}"}
-                continue
-            
-            node = node_class(node_id, node_data.data)
-            
-            # Gather inputs from predecessor nodes
-            inputs = {}
-            for edge in flow.edges:
-                if edge.target == node_id and edge.source in node_outputs:
-                    inputs[edge.sourceHandle or 'input'] = node_outputs[edge.source]
-            
-            # Execute node
-            try:
-                output = await node.execute(inputs)
-                node_outputs[node_id] = output.get('output', output)
+
+        for level in plan.levels:
+            # Nodes in the same level are independent; run them concurrently
+            # so sibling LLM calls overlap instead of serializing
+            outputs = await asyncio.gather(
+                *(self._run_node(node_id, plan, node_outputs) for node_id in level)
+            )
+            for node_id, output in zip(level, outputs):
                 results[node_id] = output
-            except Exception as e:
-                results[node_id] = {"error": str(e)}
-        
+                if "error" not in output:
+                    node_outputs[node_id] = output.get('output', output)
+
         return results
 
 # Initialize flow engine
@@ -225,48 +685,58 @@ async def root():
 
 @app.get("/flows")
 async def get_flows():
-    return {"flows": list(flows_db.values())}
+    async with db_pool.connection() as conn:
+        cursor = await conn.execute("SELECT data FROM flows")
+        rows = await cursor.fetchall()
+    # Stored blobs are already model-shaped JSON; hand the parsed dicts
+    # straight to orjson instead of revalidating and re-encoding models
+    return ORJSONResponse(content={"flows": [json.loads(row[0]) for row in rows]})
 
 @app.post("/flows")
 async def create_flow(flow: FlowData):
     flow.id = str(uuid.uuid4())
     flow.created_at = datetime.now()
     flow.updated_at = datetime.now()
-    flows_db[flow.id] = flow
+    await save_flow(flow)
+    flow_engine.compile_flow(flow)
     return flow
 
 @app.get("/flows/{flow_id}")
 async def get_flow(flow_id: str):
-    if flow_id not in flows_db:
+    flow = await load_flow(flow_id)
+    if flow is None:
         raise HTTPException(status_code=404, detail="Flow not found")
-    return flows_db[flow_id]
+    return flow
 
 @app.put("/flows/{flow_id}")
 async def update_flow(flow_id: str, flow: FlowData):
-    if flow_id not in flows_db:
+    if await load_flow(flow_id) is None:
         raise HTTPException(status_code=404, detail="Flow not found")
-    
+
     flow.id = flow_id
     flow.updated_at = datetime.now()
-    flows_db[flow_id] = flow
+    await save_flow(flow)
+    flow_engine.compile_flow(flow)
     return flow
 
 @app.delete("/flows/{flow_id}")
 async def delete_flow(flow_id: str):
-    if flow_id not in flows_db:
+    async with db_pool.connection() as conn:
+        cursor = await conn.execute("DELETE FROM flows WHERE id = ?", (flow_id,))
+        await conn.commit()
+    if cursor.rowcount == 0:
         raise HTTPException(status_code=404, detail="Flow not found")
-    
-    del flows_db[flow_id]
+    flow_engine.invalidate(flow_id)
     return {"message": "Flow deleted successfully"}
 
 @app.post("/flows/{flow_id}/execute")
 async def execute_flow(flow_id: str):
-    if flow_id not in flows_db:
+    flow = await load_flow(flow_id)
+    if flow is None:
         raise HTTPException(status_code=404, detail="Flow not found")
-    
-    flow = flows_db[flow_id]
+
     execution_id = str(uuid.uuid4())
-    
+
     execution = ExecutionResult(
         id=execution_id,
         flow_id=flow_id,
@@ -274,9 +744,9 @@ async def execute_flow(flow_id: str):
         results={},
         started_at=datetime.now()
     )
-    
-    executions_db[execution_id] = execution
-    
+
+    await save_execution(execution)
+
     try:
         results = await flow_engine.execute_flow(flow)
         execution.results = results
@@ -286,20 +756,25 @@ async def execute_flow(flow_id: str):
         execution.error = str(e)
         execution.status = "failed"
         execution.completed_at = datetime.now()
-    
-    executions_db[execution_id] = execution
+
+    await save_execution(execution)
     return execution
 
 @app.get("/executions/{execution_id}")
 async def get_execution(execution_id: str):
-    if execution_id not in executions_db:
+    async with db_pool.connection() as conn:
+        cursor = await conn.execute("SELECT data FROM executions WHERE id = ?", (execution_id,))
+        row = await cursor.fetchone()
+    if row is None:
         raise HTTPException(status_code=404, detail="Execution not found")
-    return executions_db[execution_id]
+    return ExecutionResult.model_validate_json(row[0])
 
 @app.get("/flows/{flow_id}/executions")
 async def get_flow_executions(flow_id: str):
-    executions = [exec for exec in executions_db.values() if exec.flow_id == flow_id]
-    return {"executions": executions}
+    async with db_pool.connection() as conn:
+        cursor = await conn.execute("SELECT data FROM executions WHERE flow_id = ?", (flow_id,))
+        rows = await cursor.fetchall()
+    return ORJSONResponse(content={"executions": [json.loads(row[0]) for row in rows]})
 
 # Node types endpoint for frontend
 @app.get("/node-types")
@@ -346,4 +821,9 @@ async def get_node_types():
 
 if __name__ == "__main__":
     import uvicorn
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass  # fall back to the default selector loop
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,22 @@
+import asyncio
+
+from main import FunctionNode
+
+
+def test_function_node_augmented_assignment():
+    # `total += x` compiles to an _inplacevar_ call under RestrictedPython
+    node = FunctionNode('fn', {'code': (
+        "total = 0\n"
+        "    for x in inputs['nums']:\n"
+        "        total += x\n"
+        "    return total"
+    )})
+    result = asyncio.run(node.execute({'input': '', 'nums': [1, 2, 3]}))
+    assert result == {'output': 6}
+
+
+def test_function_node_tuple_unpacking():
+    # `a, b = ...` compiles to an _unpack_sequence_ call under RestrictedPython
+    node = FunctionNode('fn', {'code': "a, b = inputs['pair']\n    return a * b"})
+    result = asyncio.run(node.execute({'input': '', 'pair': (6, 7)}))
+    assert result == {'output': 42}